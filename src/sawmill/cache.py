@@ -0,0 +1,282 @@
+"""
+This module provides the base class for per-file aggregates of a log file's entries, stored alongside its cached tables.
+
+An aggregate is built in one streaming pass (or from entries that were already parsed) and saved with the byte offset
+it reached, so when the file is appended to only the new tail is parsed. Subclasses decide what is recorded for each
+entry, e.g. time-bucketed counts (sawmill.rollup.Rollup) or entry fingerprints (sawmill.diff.FingerprintIndex).
+
+Example usage:
+    class EntryLengths(EntryCache):
+        name = "entry_lengths"
+        columns = ["line_count", "entries"]
+
+        def _parse_entry(self, contents, offset, size, columns):
+            return (columns["line_count"],), [1]
+
+        def _add(self, key, values, sign=1):
+            self.counts.setdefault(key, [0])[0] += sign * values[0]
+
+    # line_count	entries
+    EntryLengths(file_path="job_10344.txt").update().to_df()
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import (
+    Any,
+    Dict,
+    List,
+    Tuple,
+    Union,
+)
+
+import pandas as pd
+
+from . import config
+from .entry import iter_entries
+
+logger = logging.getLogger(__name__)
+
+# Number of bytes at the start of the file used to detect that it was replaced rather than appended to
+HEAD_SIZE = 4096
+
+
+class EntryCache(object):
+    """
+    Per-entry aggregates of a log file, kept up to date incrementally.
+
+    Subclasses set 'name' and 'columns', and implement '_parse_entry' and '_add'. The first 'key_size' columns form the
+    key of each row in 'counts', the remaining columns are its values.
+
+    Attributes:
+        file_path (Union[str, os.PathLike]): A valid pathlike file object or string.
+        entry_pattern (LiteralString): A valid regex pattern to identify the start of a new log entry.
+        cache_path (Path): Where the aggregate is stored, next to the file's cached tables. Keyed by the resolved path,
+            so files that share a name in different directories are kept apart.
+        counts (Dict[Tuple, List[int]]): The aggregated values of each key.
+    """
+
+    name: str = "cache"
+    columns: List[str] = []
+    key_size: int = 1
+
+    def __init__(self, file_path):
+        self.file_path: Union[str, os.PathLike] = Path(file_path)
+        self.entry_pattern = config.entry_pattern
+        path_key = hashlib.blake2b(
+            str(self.file_path.resolve()).encode("utf-8"), digest_size=8
+        ).hexdigest()
+        self.cache_path = (
+            config.local_data_root_dir
+            / self.file_path.name
+            / f"{self.name}_{path_key}.json"
+        )
+        self.counts: Dict[Tuple, List[int]] = {}
+
+        # the last entry of the file may still grow, so its contribution is tracked separately
+        self._offset: int = 0  # byte offset where the last entry starts
+        self._size: int = 0  # file size when the aggregate was last updated
+        self._head: str = ""
+        self._pending: Union[Tuple[Tuple, List[int]], None] = None
+
+    def _parse_entry(
+        self, contents: str, offset: int, size: int, columns: Dict[str, Any]
+    ) -> Tuple[Tuple, List[int]]:
+        """
+        Returns the key and values recorded for one entry.
+
+        Args:
+            contents (str): The raw text of the entry.
+            offset (int): The byte offset where the entry starts in the file.
+            size (int): The size of the entry in bytes.
+            columns (Dict[str, Any]): Values already parsed for the entry, as passed to build(). When the file is
+                streamed by update(), only 'line_count' is known.
+        """
+        raise NotImplementedError
+
+    def _add(self, key: Tuple, values: List[int], sign: int = 1) -> None:
+        """Adds (or, with sign=-1, removes) the values recorded for one entry."""
+        raise NotImplementedError
+
+    def _read_head(self, size: int = HEAD_SIZE) -> str:
+        with open(self.file_path, "rb") as file:
+            return hashlib.blake2b(file.read(size), digest_size=8).hexdigest()
+
+    def _load(self) -> bool:
+        """Loads the stored aggregate, returning False if there is none or the file no longer extends it."""
+
+        if not self.cache_path.is_file():
+            return False
+
+        try:
+            with open(self.cache_path, "r") as f:
+                state = json.load(f)
+
+            # a shrunk file, or one with a different beginning, was replaced rather than appended to
+            size = self.file_path.stat().st_size
+            head = self._read_head(min(HEAD_SIZE, state["size"]))
+            if size < state["size"] or head != state["head"]:
+                logger.info(
+                    f"{self.file_path.name} changed since its {self.name}, rebuilding"
+                )
+                return False
+
+            counts = {
+                tuple(row[: self.key_size]): row[self.key_size :]
+                for row in state["rows"]
+            }
+            pending = state["pending"]
+            if pending is not None:
+                key, values = pending
+                pending = (tuple(key), values)
+            offset, size = int(state["offset"]), int(state["size"])
+        except (OSError, ValueError, KeyError, TypeError) as error:
+            # a truncated or otherwise unreadable aggregate is rebuilt rather than trusted
+            logger.warning(
+                f"Ignoring unreadable {self.name} {self.cache_path}: {error}"
+            )
+            return False
+
+        self.counts, self._pending = counts, pending
+        self._offset, self._size, self._head = offset, size, head
+
+        return True
+
+    def _save(self) -> None:
+        self.cache_path.parent.mkdir(exist_ok=True, parents=True)
+        state = {
+            "size": self._size,
+            "head": self._head,
+            "offset": self._offset,
+            "pending": self._pending,
+            "rows": [list(key) + values for key, values in self.counts.items()],
+        }
+
+        # write to a temporary file first, so an interrupted save never leaves a partial aggregate behind
+        descriptor, temp_path = tempfile.mkstemp(
+            dir=self.cache_path.parent, prefix=f".{self.name}_", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(descriptor, "w") as f:
+                json.dump(state, f)
+            os.replace(temp_path, self.cache_path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def _finish(self, offset: int, size: int, pending) -> None:
+        """Records where the last (possibly still growing) entry starts, and saves the aggregate."""
+        self._offset, self._size, self._pending = offset, size, pending
+        self._head = self._read_head(min(HEAD_SIZE, self._size))
+        self._save()
+
+        logger.debug(
+            f"{self.name} of {self.file_path.name} updated up to byte {self._size}"
+        )
+
+    def _count_entry(self, lines: List[bytes], offset: int) -> Tuple[Tuple, List[int]]:
+        contents = b"".join(lines).decode("utf-8", errors="replace")
+        entry = self._parse_entry(
+            contents,
+            offset,
+            sum(len(line) for line in lines),
+            {"line_count": len(lines)},
+        )
+        self._add(*entry)
+
+        return entry
+
+    def update(self) -> "EntryCache":
+        """
+        Brings the aggregate up to date with the file, parsing only what was appended since the last update.
+
+        Returns:
+            EntryCache: The updated aggregate.
+        """
+
+        if self._load():
+            if self.file_path.stat().st_size == self._size:
+                return self
+            # re-read the last entry, since the appended lines may belong to it
+            if self._pending is not None:
+                self._add(*self._pending, sign=-1)
+        else:
+            self.counts, self._offset, self._pending = {}, 0, None
+
+        pattern = re.compile(self.entry_pattern.encode("utf-8"))
+        offset = self._offset
+        previous: Union[List[bytes], None] = None
+
+        with open(self.file_path, "rb") as file:
+            file.seek(offset)
+            # count each entry once the next one starts, so the last one is known
+            for lines, _ in iter_entries(file, pattern):
+                if previous is not None:
+                    self._count_entry(previous, offset)
+                    offset += sum(len(line) for line in previous)
+                previous = lines
+            size = file.tell()
+
+        # count the last entry, but remember where it starts in case it grows
+        self._finish(
+            offset, size, self._count_entry(previous, offset) if previous else None
+        )
+
+        return self
+
+    def build(self, entries: List[str], **columns: List) -> "EntryCache":
+        """
+        Builds the aggregate from entries that were already parsed, e.g. by RestructuredData.read(), instead of
+        reading the file again. Does nothing if the stored aggregate is current, and falls back to update() if the
+        entries don't account for every byte of the file.
+
+        Args:
+            entries (List[str]): The raw text of every entry in the file, in file order.
+            **columns (List): Values already parsed for each entry, passed on to '_parse_entry'.
+
+        Returns:
+            EntryCache: The updated aggregate.
+        """
+
+        size = self.file_path.stat().st_size
+        if self._load() and size == self._size:
+            return self
+
+        entry_sizes = [len(entry.encode("utf-8")) for entry in entries]
+        if sum(entry_sizes) != size:
+            # e.g. translated newlines, so byte offsets can't be derived from the entries
+            return self.update()
+
+        columns = {name: list(values) for name, values in columns.items()}
+        self.counts, pending, offset = {}, None, 0
+        for index, (entry, entry_size) in enumerate(
+            zip(entries, entry_sizes, strict=True)
+        ):
+            pending = self._parse_entry(
+                entry,
+                offset,
+                entry_size,
+                {name: values[index] for name, values in columns.items()},
+            )
+            self._add(*pending)
+            offset += entry_size
+
+        # the last entry starts where the bytes of every other entry end
+        self._finish(size - (entry_sizes[-1] if pending else 0), size, pending)
+
+        return self
+
+    def to_df(self) -> pd.DataFrame:
+        """
+        Returns:
+            pd.DataFrame: One row per key, with its values.
+        """
+        return pd.DataFrame(
+            [list(key) + values for key, values in self.counts.items()],
+            columns=self.columns,
+        )
@@ -2,12 +2,18 @@ import logging
 from pathlib import Path
 
 # from io import TextIO
-from typing import Union
+from typing import List, Union
 
+import duckdb
+import pandas as pd
 import typer
+from pandas.tseries.frequencies import to_offset
 
+from .diff import diff_files
 from .restructured import RestructuredData
-from .tui import live_logs
+from .rollup import rollups
+from .sample import EntrySampler
+from .tui import console, live_logs, timeline as timeline_table
 
 logging.basicConfig(level=logging.INFO)
 root = logging.getLogger()
@@ -16,34 +22,144 @@ logger = logging.getLogger(__name__)
 app = typer.Typer()
 
 
+def _check_sample_options(
+    sample: Union[float, None], sample_entries: Union[int, None]
+) -> None:
+    """Reports invalid --sample/--sample-entries values as a usage error, not a traceback"""
+    if sample is None and sample_entries is None:
+        return
+
+    try:
+        EntrySampler(rate=sample, size=sample_entries)
+    except ValueError as error:
+        raise typer.BadParameter(str(error)) from error
+
+
+def _check_bucket(bucket: str) -> None:
+    """Accepts only whole numbers of minutes, e.g. '1min', '5min' or '1h', since rollups count entries per minute"""
+    try:
+        length = pd.to_timedelta(to_offset(bucket))
+    except ValueError as error:
+        raise typer.BadParameter(
+            f"{bucket!r} is not a fixed-length time bucket, e.g. '5min' or '1h'"
+        ) from error
+    if length < pd.Timedelta(minutes=1) or length % pd.Timedelta(minutes=1):
+        raise typer.BadParameter(
+            f"{bucket!r} must be a whole number of minutes, e.g. '5min' or '1h', "
+            "since rollups count entries per minute"
+        )
+
+
 @app.command()
-def find(file_path: str, query: str):
+def find(
+    file_path: str,
+    query: str,
+    sample: Union[float, None] = None,
+    sample_entries: Union[int, None] = None,
+):
     """Convert an unstructured text file into csv-like (columns, rows) output
 
+    Use --sample RATE or --sample-entries N to query a random sample of whole entries
+    instead of the full file. Each sampled row's 'weight' column holds the number of entries
+    it stands for. Result columns that count entries ('count(*)', or aliases starting with
+    'count') get a scaled estimate and 95% bounds. Other aggregates, and counts over
+    df_lines, are not scaled or bounded. Approximate counts and distinct values of
+    log_status and component over the full file are printed after the results.
+
     Example:
-        pass"""
+        sawmill find big.log "SELECT log_status, sum(weight) FROM df_entries GROUP BY ALL" --sample 0.01
+    """
+
+    _check_sample_options(sample, sample_entries)
 
     # ingest data from the file
-    restructured_file = RestructuredData(file_path=file_path)
+    restructured_file = RestructuredData(
+        file_path=file_path, sample_rate=sample, sample_entries=sample_entries
+    )
 
     # print to the terminal the results for the user
     if Path(query).is_file():
         with open(query, "r") as f:
             query_from_file = f.read()
-            restructured_file.search(query_from_file)
+            results = restructured_file.search(query_from_file)
     else:
-        restructured_file.search(query)
+        results = restructured_file.search(query)
+
+    print(restructured_file.scale_counts(results))
+
+    if restructured_file.sampler is not None:
+        print(restructured_file.estimates())
 
 
 @app.command()
-def view(file_path: str, query: Union[str, None] = None):
+def view(
+    file_path: str,
+    query: Union[str, None] = None,
+    sample: Union[float, None] = None,
+    sample_entries: Union[int, None] = None,
+):
+    _check_sample_options(sample, sample_entries)
+
     # ingest data from the file
-    restructured_file = RestructuredData(file_path=file_path)
+    restructured_file = RestructuredData(
+        file_path=file_path, sample_rate=sample, sample_entries=sample_entries
+    )
     logs = restructured_file.search(query)
 
     live_logs(logs=logs)
 
 
+@app.command()
+def diff(file_path_a: str, file_path_b: str, query: Union[str, None] = None):
+    """Compare two log files by their normalized entry fingerprints
+
+    Reports which entries are new in FILE_PATH_B, which disappeared from FILE_PATH_A and
+    which occur a different number of times. The result can be queried as 'df_diff'.
+
+    Example:
+        sawmill diff run_1787.txt run_1788.txt --query "SELECT * FROM df_diff WHERE status = 'new'"
+    """
+    df_diff = diff_files(file_path_a, file_path_b)  # noqa: F841
+
+    if query is None:
+        results = df_diff
+    elif Path(query).is_file():
+        with open(query, "r") as f:
+            results = duckdb.query(f.read()).to_df()
+    else:
+        results = duckdb.query(query).to_df()
+
+    # show whole entries, as RestructuredData.search does, rather than pandas' truncated defaults
+    pd.set_option("display.max_colwidth", 400)
+    pd.set_option("display.width", 800)
+    pd.set_option("display.max_columns", None)
+    pd.set_option("display.max_rows", None)
+
+    print(results)
+
+
+@app.command()
+def timeline(
+    file_paths: List[str], bucket: str = "1min", status: Union[str, None] = None
+):
+    """Show a histogram of entries over time, per log status, for one or more files
+
+    Answers come from each file's precomputed rollup (counts per minute x log_status x
+    component), which is only updated with what was appended since it was last built.
+    --bucket must therefore be a whole number of minutes, e.g. '1min', '5min' or '1h'.
+
+    Example:
+        sawmill timeline run_1787.txt run_1788.txt --bucket 5min --status ERROR
+    """
+    _check_bucket(bucket)
+    df_rollups = rollups(file_paths)
+
+    if status is not None:
+        df_rollups = df_rollups[df_rollups["log_status"] == status]
+
+    console.print(timeline_table(df_rollups, bucket=bucket))
+
+
 def main():
     app()
 
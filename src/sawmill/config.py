@@ -1,3 +1,19 @@
+from pathlib import Path
+
+# A line matching this pattern starts a new log entry
+entry_pattern = r"^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})"
+
+column_patterns = {
+    "date": r"(\d{4}-\d{2}-\d{2})",  # Matches a date in the format YYYY-MM-DD
+    "time": r"(\d{2}:\d{2}:\d{2})",  # Matches a time in the format HH:MM:SS
+    "log_status": r"\b(INFO|WARN|ERROR|DEBUG|TRACE|NOTICE)\b",  # Matches on INFO|WARN|ERROR|DEBUG|TRACE|NOTICE messages
+    "component": r"(?<=\d{4}-\d{2}-\d{2}\s\d{2}:\d{2}:\d{2}\s)(?!INFO|WARN|ERROR|DEBUG\b)(\w+)(?=\s*>)",  # Matches any one word after a timestamp that is not INFO, WARN, ERROR, DEBUG
+    # "message": r"(.+)",  # Matches one or more of any character
+}
+
+# TODO refactor things like local data caching to the user directory
+local_data_root_dir = Path(__name__).parent.parent.parent / "data"
+
 schema_template = {
     "session": {
         "pk": "int",
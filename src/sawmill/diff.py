@@ -0,0 +1,248 @@
+"""
+This module compares two log files entry-by-entry using normalized, hashed entry fingerprints.
+
+Each entry is normalized (timestamps, ANSI colour codes and volatile tokens such as ids, hex
+addresses, durations and byte counts are masked) and hashed into a 64-bit fingerprint. Each file
+is reduced to a `{fingerprint: count}` index, which is stored alongside the file's cached tables and,
+like its rollup, only extended with the entries appended since it was last updated. The two indexes
+are compared with plain set operations, so a diff of unchanged files costs work proportional to the
+number of *distinct* entries, and only the entries that differ are read back for display.
+
+Example usage:
+    from sawmill.diff import diff_files
+
+    results = diff_files("run_1787.txt", "run_1788.txt")
+
+    # one row per distinct normalized entry whose presence or count differs between the files
+    results[results.status == "new"]
+"""
+
+import hashlib
+import logging
+import re
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Tuple,
+    Union,
+)
+
+import pandas as pd
+
+from .cache import EntryCache
+from .entry import iter_entries
+
+logger = logging.getLogger(__name__)
+
+# numbers that are masked by their shape or unit, matched in one pass and replaced by '<group name>'
+NUMBER_TOKENS = re.compile(
+    r"\b(?:"
+    r"(?P<ip>(?:\d{1,3}\.){3}\d{1,3}\b)"  # IPv4 addresses, e.g. 'Pod IP: 10.0.0.12'
+    r"|(?P<duration>\d+(?:\.\d+)?\s*(?:ns|us|µs|ms|s|sec|secs|seconds?|m|min|mins|minutes?|h|hours?)\b)"  # e.g. '1.5s'
+    r"|(?P<bytes>\d+(?:\.\d+)?\s*(?:[KMGT]i?B|B|bytes?)\b)"  # byte counts, e.g. '1024 bytes', '3.2 MB'
+    r"|(?P<n>\d{5,}\b)"  # long numeric ids; short status and exit codes are kept
+    r")"
+)
+
+# ordered list of (compiled pattern, replacement) pairs applied to every entry before hashing
+VOLATILE_PATTERNS: List[Tuple[re.Pattern, Union[str, Callable[[re.Match], str]]]] = [
+    (re.compile(r"\x1b\[[0-9;]*m"), ""),  # ANSI colour codes, e.g. '\x1b[32mINFO\x1b[m'
+    (
+        re.compile(r"\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?Z?"),
+        "<ts>",
+    ),  # timestamps
+    (
+        re.compile(
+            r"\b[0-9a-fA-F]{8}[-_][0-9a-fA-F]{4}[-_][0-9a-fA-F]{4}[-_][0-9a-fA-F]{4}[-_][0-9a-fA-F]{12}\b"
+        ),
+        "<uuid>",
+    ),  # UUIDs, including the underscore variant used in file names
+    (
+        re.compile(r"@[0-9a-fA-F]{4,}\b"),
+        "@<hex>",
+    ),  # object addresses, e.g. 'Output@eb01063'
+    # hex literals; the literal '0x' comes first so the regex engine can skip ahead to it
+    (re.compile(r"0x(?<!\w0x)[0-9a-fA-F]+\b"), "<hex>"),
+    (NUMBER_TOKENS, lambda match: f"<{match.lastgroup}>"),
+    (
+        re.compile(r"(?<![^\W_])((?:id|ID|Id|pid|PID)[=:]\s*)\d+\b"),
+        r"\g<1><n>",
+    ),  # key=value ids, e.g. 'job id: 1787', 'job_id=42', 'pid=42', but not 'valid: 3'
+    (
+        re.compile(r"(?<=/)\d+(?=/)"),
+        "<n>",
+    ),  # numeric path segments, e.g. '/workspace/1787/0/logs.log'
+    (re.compile(r"[ \t]+"), " "),  # collapse runs of whitespace
+]
+
+
+def normalize_entry(
+    entry: str,
+    patterns: List[
+        Tuple[re.Pattern, Union[str, Callable[[re.Match], str]]]
+    ] = VOLATILE_PATTERNS,
+) -> str:
+    r"""
+    Masks volatile tokens in an entry so that the same event logged in different runs compares equal.
+
+    Args:
+        entry (str): The raw text of an entry, possibly spanning several lines.
+        patterns (List[Tuple[re.Pattern, Union[str, Callable]]]): Ordered (compiled pattern, replacement) pairs to
+            apply, as accepted by re.Pattern.sub.
+
+    Returns:
+        str: The normalized entry text.
+
+    Examples:
+        >>> normalize_entry(
+        ...     "2024-03-28 13:29:16 \x1b[32mINFO\x1b[m job id: 1787 attempt id: 0\n"
+        ... )
+        '<ts> INFO job id: <n> attempt id: <n>'
+        >>> normalize_entry(
+        ...     "Destination process done (exit code 137) after 2.5s, wrote 1024 bytes"
+        ... )
+        'Destination process done (exit code 137) after <duration>, wrote <bytes>'
+    """
+    for pattern, replacement in patterns:
+        entry = pattern.sub(replacement, entry)
+
+    return entry.strip()
+
+
+def fingerprint(entry: str) -> int:
+    """
+    Hashes a (normalized) entry into a signed 64-bit integer, so fingerprints fit in an int64 column.
+
+    Args:
+        entry (str): The entry text to hash.
+
+    Returns:
+        int: A stable 64-bit fingerprint of the entry.
+
+    Examples:
+        >>> fingerprint("<ts> INFO job id: <n>") == fingerprint("<ts> INFO job id: <n>")
+        True
+        >>> -(2**63) <= fingerprint("<ts> INFO job id: <n>") < 2**63
+        True
+    """
+    digest = hashlib.blake2b(entry.encode("utf-8"), digest_size=8).digest()
+
+    return int.from_bytes(digest, "little", signed=True)
+
+
+class FingerprintIndex(EntryCache):
+    """
+    The number of occurrences of each entry fingerprint in a log file, kept up to date incrementally like
+    sawmill.rollup.Rollup. Instead of the entry text, the byte offset of the first occurrence of each fingerprint is
+    stored, so an entry can be shown without keeping every distinct entry in memory.
+
+    Attributes:
+        file_path (Union[str, os.PathLike]): A valid pathlike file object or string.
+        cache_path (Path): Where the index is stored, next to the file's cached tables.
+        counts (Dict[Tuple[int], List[int]]): The [count, first_offset] of each fingerprint.
+    """
+
+    name = "fingerprints"
+    columns = ["fingerprint", "count", "first_offset"]
+
+    def _add(self, key: Tuple[int], values: List[int], sign: int = 1) -> None:
+        count, first_offset = values
+        totals = self.counts.setdefault(key, [0, first_offset])
+        totals[0] += sign * count
+        totals[1] = min(totals[1], first_offset)
+
+        # the last entry is the only one that's ever removed, so the first offset of a remaining fingerprint is kept
+        if totals[0] == 0:
+            del self.counts[key]
+
+    def _parse_entry(
+        self, contents: str, offset: int, size: int, columns: Dict[str, Any]
+    ) -> Tuple[Tuple[int], List[int]]:
+        # hash the same text whether the entry was read in text mode (translated newlines) or binary mode
+        normalized = normalize_entry(contents.replace("\r\n", "\n"))
+
+        return (fingerprint(normalized),), [1, offset]
+
+    def entry_at(self, offset: int) -> str:
+        """
+        Reads the entry starting at a byte offset of the file.
+
+        Args:
+            offset (int): The byte offset where the entry starts, e.g. the 'first_offset' of a fingerprint.
+
+        Returns:
+            str: The raw text of the entry.
+        """
+        with open(self.file_path, "rb") as file:
+            file.seek(offset)
+            lines, _ = next(
+                iter_entries(file, re.compile(self.entry_pattern.encode("utf-8")))
+            )
+
+        return b"".join(lines).decode("utf-8", errors="replace")
+
+
+def diff_files(file_path_a, file_path_b) -> pd.DataFrame:
+    """
+    Compares two files by their entry fingerprints. Each file's fingerprint index is loaded from the file cache (it's
+    kept current by RestructuredData.read()), and only rebuilt or extended if the file changed since.
+
+    Args:
+        file_path_a (Union[str, os.PathLike]): The baseline file, e.g. the run before an upgrade.
+        file_path_b (Union[str, os.PathLike]): The file to compare against the baseline.
+
+    Returns:
+        pd.DataFrame: One row per fingerprint whose presence or count differs between the files, with
+            the columns 'fingerprint', 'status' ('new', 'disappeared' or 'changed_count'), 'count_a',
+            'count_b', 'delta' and 'entry' (the normalized entry text).
+    """
+    index_a = FingerprintIndex(file_path=file_path_a).update()
+    index_b = FingerprintIndex(file_path=file_path_b).update()
+    counts_a, counts_b = index_a.counts, index_b.counts
+
+    keys_a, keys_b = counts_a.keys(), counts_b.keys()
+    changed = {key for key in keys_a & keys_b if counts_a[key][0] != counts_b[key][0]}
+
+    diff = {
+        "fingerprint": [],
+        "status": [],
+        "count_a": [],
+        "count_b": [],
+        "delta": [],
+        "entry": [],
+    }
+    for status, keys in (
+        ("new", keys_b - keys_a),
+        ("disappeared", keys_a - keys_b),
+        ("changed_count", changed),
+    ):
+        for key in keys:
+            count_a = counts_a[key][0] if key in counts_a else 0
+            count_b = counts_b[key][0] if key in counts_b else 0
+            # only the entries that differ are read back, from wherever they first occur
+            index, (_, first_offset) = (
+                (index_b, counts_b[key])
+                if key in counts_b
+                else (index_a, counts_a[key])
+            )
+
+            diff["fingerprint"].append(key[0])
+            diff["status"].append(status)
+            diff["count_a"].append(count_a)
+            diff["count_b"].append(count_b)
+            diff["delta"].append(count_b - count_a)
+            diff["entry"].append(normalize_entry(index.entry_at(first_offset)))
+
+    logger.info(
+        f"{Path(file_path_a).name} -> {Path(file_path_b).name}: "
+        f"{len(keys_b - keys_a)} new, {len(keys_a - keys_b)} disappeared, {len(changed)} changed count"
+    )
+
+    return (
+        pd.DataFrame(diff)
+        .sort_values(["status", "delta"], ascending=[True, False])
+        .reset_index(drop=True)
+    )
@@ -1,5 +1,6 @@
-from typing import Dict, List
+from typing import Dict, Iterator, List, Tuple
 import logging
+import re
 
 
 logger = logging.getLogger(__name__)
@@ -59,3 +60,35 @@ class Entry:
         self.lines = []
         self._line_numbers = []
         self._entry = ""
+
+
+def iter_entries(file, pattern: re.Pattern) -> Iterator[Tuple[List, List[int]]]:
+    r"""Streams an open file and yields one (possibly multi-line) entry at a time.
+
+    Args:
+        file: A file opened in text or binary mode; 'pattern' must be compiled from the
+            matching type (str or bytes).
+        pattern: A compiled regex that matches the first line of each entry.
+
+    Yields:
+        The entry's lines, and the line number of each line counted from where the file
+        was positioned when iteration started.
+
+    Examples:
+        >>> import io
+        >>> file = io.StringIO("header\n2024-03-20 23:12:33 ERROR boom\n\tat trace\n")
+        >>> list(iter_entries(file, re.compile(r"^\d{4}-")))
+        [(['header\n'], [0]), (['2024-03-20 23:12:33 ERROR boom\n', '\tat trace\n'], [1, 2])]
+    """
+    lines, line_numbers = [], []
+    for index, line in enumerate(file):
+        # a line matching the entry pattern closes the previous entry
+        if pattern.match(line) and lines:
+            yield lines, line_numbers
+            lines, line_numbers = [], []
+        lines.append(line)
+        line_numbers.append(index)
+
+    # flush the last, unfinished entry
+    if lines:
+        yield lines, line_numbers
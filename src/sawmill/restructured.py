@@ -33,7 +33,11 @@ from typing import (
 import duckdb
 import pandas as pd
 
-from .entry import Entry, Line
+from . import config
+from .diff import FingerprintIndex
+from .entry import Entry, Line, iter_entries
+from .rollup import Rollup
+from .sample import CountMinSketch, EntrySampler, HyperLogLog, estimate_count
 
 logger = logging.getLogger(__name__)
 
@@ -51,22 +55,36 @@ class RestructuredData(object):
         column_patterns (Dict[str,str]): A dictionary of key-value pairs representing 'column_name': 'regex pattern'
         _entries (pd.DataFrame): DataFrame that stores raw entries and their line numbers.
         data (pd.DataFrame): DataFrame that stores extracted metadata from each entry, along with related raw entry.
+        sampler (Union[EntrySampler, None]): When set, only a uniform random sample of whole entries is kept.
+        sketches (Dict[str, Dict]): Distinct-value and frequency sketches of selected columns, computed over every entry
+            while sampling.
     """
 
-    def __init__(self, file_path, file_id=0):
+    def __init__(
+        self,
+        file_path,
+        file_id=0,
+        sample_rate: Union[float, None] = None,
+        sample_entries: Union[int, None] = None,
+    ):
         """
         Initializes the RestructuredData object with empty DataFrames for entries and data.
+
+        Set either 'sample_rate' (keep each entry with that probability) or 'sample_entries' (keep a reservoir of that
+        many entries) to only materialize a sample of the file's entries.
         """
-        self.entry_pattern: LiteralString = r"^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})"
-        self.column_patterns = {
-            "date": r"(\d{4}-\d{2}-\d{2})",  # Matches a date in the format YYYY-MM-DD
-            "time": r"(\d{2}:\d{2}:\d{2})",  # Matches a time in the format HH:MM:SS
-            "log_status": r"\b(INFO|WARN|ERROR|DEBUG|TRACE|NOTICE)\b",  # Matches on INFO|WARN|ERROR|DEBUG|TRACE|NOTICE messages
-            "component": r"(?<=\d{4}-\d{2}-\d{2}\s\d{2}:\d{2}:\d{2}\s)(?!INFO|WARN|ERROR|DEBUG\b)(\w+)(?=\s*>)",  # Matches any one word after a timestamp that is not INFO, WARN, ERROR, DEBUG
-            # "message": r"(.+)",  # Matches one or more of any character
-        }
+        self.entry_pattern: LiteralString = config.entry_pattern
+        self.column_patterns = dict(config.column_patterns)
         self.file_path: Union[str, TextIO, os.PathLike] = Path(file_path)
         self.file_id = file_id
+        self.sampler: Union[EntrySampler, None] = None
+        self.sketches: Dict[str, Dict] = {}
+        if sample_rate is not None or sample_entries is not None:
+            self.sampler = EntrySampler(rate=sample_rate, size=sample_entries)
+            self.sketches = {
+                column: {"distinct": HyperLogLog(), "frequency": CountMinSketch()}
+                for column in ("log_status", "component")
+            }
         self._data: List[pd.DataFrame] | None = None
         self._default_query = """
         SELECT * FROM df_entries as e
@@ -90,7 +108,8 @@ class RestructuredData(object):
             "id": [self.file_id],  # List[int]
             "path": [self.file_path],
             "name": [self.file_path.name],
-            "contents": [self._read_contents()],
+            # skip holding the whole file in memory when sampling, as the file is likely large
+            "contents": [self._read_contents() if self.sampler is None else None],
         }
 
     def _extract(self) -> pd.DataFrame:
@@ -138,6 +157,9 @@ class RestructuredData(object):
             ...      records[4] == {'entry': '2024-03-20 23:12:36 destination > WARN StatusConsoleListener The use of package scanning to locate plugins is deprecated and will be removed in a future release', 'line_numbers': [9]}
         """
 
+        if self.sampler is not None:
+            return self._extract_sample()
+
         # Compile the regex pattern for identifying the start of log entries.
         pattern = re.compile(self.entry_pattern, re.MULTILINE)
 
@@ -173,6 +195,133 @@ class RestructuredData(object):
                 )
                 self.entries = entry.update(entries=self.entries)
 
+    def _extract_sample(self) -> None:
+        """
+        Streams through the file using the same entry boundaries as _extract, but only keeps the entries (and their
+        lines) chosen by the sampler. Every entry still updates the column sketches, so they cover the whole file.
+        """
+
+        pattern = re.compile(self.entry_pattern)
+
+        with open(self.file_path, "r") as file:
+            for entry_id, (lines, line_numbers) in enumerate(
+                iter_entries(file, pattern)
+            ):
+                self._offer(entry_id, lines, line_numbers)
+
+        # Materialize the sampled entries in file order
+        for entry_id, lines, line_numbers in sorted(self.sampler.sample):
+            self.entries["id"].append(entry_id)
+            self.entries["entry"].append("".join(lines))
+            self.entries["line_numbers"].append(line_numbers)
+            self.entries["file_id"].append(self.file_id)
+            for line_number, line in zip(line_numbers, lines, strict=True):
+                self.lines["id"].append(line_number)
+                self.lines["line"].append(line)
+                self.lines["entry_id"].append(entry_id)
+                self.lines["file_id"].append(self.file_id)
+
+        logger.info(
+            f"Sampled {len(self.sampler.sample)} of {self.sampler.seen} entries from {self.file_path.name}"
+        )
+
+    def _offer(self, entry_id: int, lines: List[str], line_numbers: List[int]) -> None:
+        """Updates the column sketches with a complete entry, and offers it to the sampler."""
+
+        contents = "".join(lines)
+        for column_name, sketches in self.sketches.items():
+            match = re.search(self.column_patterns[column_name], contents)
+            value = match.group(1) if match else None
+            sketches["distinct"].add(value)
+            sketches["frequency"].add(value)
+
+        self.sampler.offer((entry_id, lines, line_numbers))
+
+    def estimates(self) -> pd.DataFrame:
+        """
+        Summarizes a sampled read() as approximate answers for the whole file.
+
+        Returns:
+            pd.DataFrame: One row per frequent value of each sketched column, with the count observed in the sample,
+                that count scaled to the whole file with a 95% interval, the count-min sketch estimate over the whole
+                file, and the HyperLogLog estimate of the column's number of distinct values.
+        """
+
+        if self.sampler is None:
+            raise ValueError(
+                "Estimates are only available when reading a sample of the file"
+            )
+
+        sample_size, population = len(self.sampler.sample), self.sampler.seen
+        sampled = self.data["entries"]
+
+        estimates = {
+            "column": [],
+            "value": [],
+            "sample_count": [],
+            "estimated_count": [],
+            "low_95": [],
+            "high_95": [],
+            "sketch_count": [],
+            "distinct_values": [],
+        }
+        for column_name, sketches in self.sketches.items():
+            sample_counts = sampled[column_name].value_counts()
+            for value, sketch_count in sketches["frequency"].most_common(10):
+                sample_count = int(sample_counts.get(value, 0))
+                estimate, low, high = estimate_count(
+                    sample_count, sample_size, population
+                )
+                estimates["column"].append(column_name)
+                estimates["value"].append(value)
+                estimates["sample_count"].append(sample_count)
+                estimates["estimated_count"].append(round(estimate))
+                estimates["low_95"].append(round(low))
+                estimates["high_95"].append(round(high))
+                estimates["sketch_count"].append(sketch_count)
+                estimates["distinct_values"].append(sketches["distinct"].count())
+
+        return pd.DataFrame(estimates)
+
+    def scale_counts(self, results: pd.DataFrame) -> pd.DataFrame:
+        """
+        Scales the entry counts in a query result over a sample up to the whole file.
+
+        Integer columns named 'count_star()' (an unaliased 'count(*)') or starting with 'count' are treated as counts
+        of sampled entries, i.e. rows of df_entries. Each gets '<column>_estimate', '<column>_low_95' and
+        '<column>_high_95' columns. Other columns, and counts of df_lines rows, are left as they are.
+
+        Args:
+            results (pd.DataFrame): The result of a query over the sampled tables.
+
+        Returns:
+            pd.DataFrame: The results, with the added estimate columns.
+        """
+
+        if self.sampler is None:
+            return results
+
+        sample_size, population = len(self.sampler.sample), self.sampler.seen
+        count_columns = [
+            column
+            for column in results.columns
+            if (column == "count_star()" or str(column).lower().startswith("count"))
+            and pd.api.types.is_integer_dtype(results[column])
+        ]
+
+        results = results.copy()
+        for column in count_columns:
+            bounds = [
+                estimate_count(int(count), sample_size, population)
+                for count in results[column]
+            ]
+            for index, suffix in enumerate(("estimate", "low_95", "high_95")):
+                results[f"{column}_{suffix}"] = [
+                    round(bound[index]) for bound in bounds
+                ]
+
+        return results
+
     def _read_contents(self) -> str:
         with open(self.file_path, "r") as file:
             contents = file.read()
@@ -278,11 +427,13 @@ class RestructuredData(object):
                 self._raw_entries, pattern
             )
 
-        # TODO refactor things like local data caching to the user directory
+        # Each sampled entry stands for 'weight' entries of the file, e.g. SELECT sum(weight) ... GROUP BY ...
+        if self.sampler is not None:
+            self.data["entries"]["weight"] = self.sampler.scale
+
         # TODO: add rules about purging old data
         # TODO: move app-level config to a separate config file and corresponding config object
-        local_data_root_dir = Path(__name__).parent.parent.parent / "data"
-        cache_dir = local_data_root_dir / Path(self.file_path).name
+        cache_dir = config.local_data_root_dir / Path(self.file_path).name
         cache_dir.mkdir(exist_ok=True, parents=True)
         timestamp = pd.Timestamp.now().strftime("%Y-%m-%d_%H:%M:%S")
         for tablename, records in self.data.items():
@@ -296,6 +447,18 @@ class RestructuredData(object):
                 index=False,
             )
 
+        # Keep the file's time-bucketed rollup (for 'sawmill timeline') and fingerprint index (for 'sawmill diff')
+        # current, from the entries parsed above. A sample doesn't cover every entry, so it's left to those commands
+        # to build them in that case.
+        if self.sampler is None:
+            Rollup(file_path=self.file_path).build(
+                entries=self._raw_entries,
+                line_numbers=self.entries["line_numbers"],
+                log_statuses=self.data["entries"]["log_status"].tolist(),
+                components=self.data["entries"]["component"].tolist(),
+            )
+            FingerprintIndex(file_path=self.file_path).build(entries=self._raw_entries)
+
         return self.data
 
     def search(self, query: Union[str, None] = None) -> pd.DataFrame:
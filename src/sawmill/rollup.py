@@ -0,0 +1,157 @@
+"""
+This module maintains per-file, time-bucketed rollups of a log file, stored alongside its cached tables.
+
+A rollup counts entries, bytes and multi-line entries per minute x log_status x component. It is built
+in one streaming pass and saved with the byte offset it reached, so when the file is appended to only
+the new tail is parsed. Questions like "when did errors spike, and in which component?" can then be
+answered from the rollup alone, without re-reading or re-parsing the raw entries.
+
+Example usage:
+    from sawmill.rollup import Rollup
+
+    rollup = Rollup(file_path="job_10344.txt")
+    rollup.update()
+
+    # minute	log_status	component	entries	bytes	multiline_entries
+    rollup.to_df()
+"""
+
+import logging
+import os
+import re
+from typing import (
+    Any,
+    Dict,
+    List,
+    Tuple,
+    Union,
+)
+
+import pandas as pd
+
+from . import config
+from .cache import EntryCache
+
+logger = logging.getLogger(__name__)
+
+# Rollup keys are (minute, log_status, component); values are [entries, bytes, multiline_entries]
+RollupKey = Tuple[Union[str, None], Union[str, None], Union[str, None]]
+
+
+class Rollup(EntryCache):
+    """
+    Time-bucketed counts of a log file's entries, kept up to date incrementally.
+
+    Attributes:
+        file_path (Union[str, os.PathLike]): A valid pathlike file object or string.
+        entry_pattern (LiteralString): A valid regex pattern to identify the start of a new log entry.
+        column_patterns (Dict[str,str]): The 'log_status' and 'component' regex patterns.
+        cache_path (Path): Where the rollup is stored, next to the file's cached tables. Keyed by the resolved path, so
+            files that share a name in different directories get their own rollup.
+        counts (Dict[RollupKey, List[int]]): The rollup counts.
+    """
+
+    name = "rollup"
+    columns = [
+        "minute",
+        "log_status",
+        "component",
+        "entries",
+        "bytes",
+        "multiline_entries",
+    ]
+    key_size = 3
+
+    def __init__(self, file_path):
+        super().__init__(file_path)
+        self.column_patterns = {
+            column_name: config.column_patterns[column_name]
+            for column_name in ("log_status", "component")
+        }
+
+    def _add(self, key: RollupKey, values: List[int], sign: int = 1) -> None:
+        totals = self.counts.setdefault(key, [0, 0, 0])
+        for index, value in enumerate(values):
+            totals[index] += sign * value
+
+        if totals[0] == 0:
+            del self.counts[key]
+
+    def _minute(self, contents: str) -> Union[str, None]:
+        # bucket by minute, e.g. '2024-03-28 13:29'
+        timestamp = re.match(self.entry_pattern, contents)
+
+        return timestamp.group(1)[:16] if timestamp else None
+
+    def _parse_entry(
+        self, contents: str, offset: int, size: int, columns: Dict[str, Any]
+    ) -> Tuple[RollupKey, List[int]]:
+        # use the columns RestructuredData.read() already extracted, if any
+        key = (
+            self._minute(contents),
+            *(
+                columns[column_name]
+                if column_name in columns
+                else (
+                    match.group(1) if (match := re.search(pattern, contents)) else None
+                )
+                for column_name, pattern in self.column_patterns.items()
+            ),
+        )
+
+        return key, [1, size, int(columns["line_count"] > 1)]
+
+    def build(
+        self,
+        entries: List[str],
+        line_numbers: List[List[int]],
+        log_statuses: List[Union[str, None]],
+        components: List[Union[str, None]],
+    ) -> "Rollup":
+        """
+        Builds the rollup from entries that were already parsed, e.g. by RestructuredData.read(), instead of reading
+        the file again. Falls back to update() if the entries don't account for every byte of the file.
+
+        Args:
+            entries (List[str]): The raw text of every entry in the file, in file order.
+            line_numbers (List[List[int]]): The line numbers of each entry.
+            log_statuses (List[Union[str, None]]): The 'log_status' column of each entry.
+            components (List[Union[str, None]]): The 'component' column of each entry.
+
+        Returns:
+            Rollup: The updated rollup.
+        """
+
+        return super().build(
+            entries,
+            line_count=[len(numbers) for numbers in line_numbers],
+            log_status=log_statuses,
+            component=components,
+        )
+
+    def to_df(self) -> pd.DataFrame:
+        """
+        Returns:
+            pd.DataFrame: One row per minute x log_status x component, with entry, byte and multi-line entry counts.
+        """
+        return super().to_df()
+
+
+def rollups(file_paths: List[Union[str, os.PathLike]]) -> pd.DataFrame:
+    """
+    Brings the rollups of several files up to date and combines them into one table.
+
+    Args:
+        file_paths (List[Union[str, os.PathLike]]): Valid pathlike file objects or strings.
+
+    Returns:
+        pd.DataFrame: The rollup rows of every file, with an extra 'file' column holding the path of
+            the file it came from.
+    """
+    frames = []
+    for file_path in file_paths:
+        frame = Rollup(file_path=file_path).update().to_df()
+        frame.insert(0, "file", str(file_path))
+        frames.append(frame)
+
+    return pd.concat(frames, ignore_index=True)
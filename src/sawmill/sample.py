@@ -0,0 +1,263 @@
+"""
+This module provides the building blocks for sawmill's approximate-answer ('--sample') mode.
+
+* EntrySampler keeps a uniform random sample of whole entries while the file is streamed, either
+  a fixed-size reservoir ('--sample-entries N') or a Bernoulli sample ('--sample RATE').
+* HyperLogLog estimates the number of distinct values of a column in a few KB of memory.
+* CountMinSketch estimates how often each value of a column occurs, and tracks the most common ones.
+
+The sketches are fed every entry of the file, so their answers cover the full stream even though
+only the sampled entries are materialized into tables.
+
+Example usage:
+    sampler = EntrySampler(size=1000)
+    distinct = HyperLogLog()
+
+    for entry in entries:
+        sampler.offer(entry)
+        distinct.add(entry.component)
+
+    sampler.sample, sampler.scale, distinct.count()
+"""
+
+import hashlib
+import math
+import random
+from typing import (
+    Any,
+    Dict,
+    List,
+    Tuple,
+    Union,
+)
+
+
+def _hash64(value: str, salt: bytes = b"") -> int:
+    """Hashes a string into an unsigned 64-bit integer."""
+    digest = hashlib.blake2b(value.encode("utf-8"), digest_size=8, salt=salt).digest()
+
+    return int.from_bytes(digest, "little")
+
+
+def estimate_count(
+    sample_count: int, sample_size: int, population: int, z: float = 1.96
+) -> Tuple[float, float, float]:
+    """
+    Scales a count observed in a uniform sample up to the full population, with a Wilson score
+    confidence interval (95% by default). Unlike the normal approximation, the Wilson interval stays
+    informative for rare values: a value that was never sampled still gets a non-zero upper bound.
+    The finite population correction is applied through the effective sample size.
+
+    Args:
+        sample_count (int): Number of sampled entries with the property of interest.
+        sample_size (int): Number of entries in the sample.
+        population (int): Number of entries in the full file.
+        z (float): The z-score of the confidence level.
+
+    Returns:
+        Tuple[float, float, float]: The estimated count, and the lower and upper bounds of its interval.
+
+    Examples:
+        >>> estimate, low, high = estimate_count(10, 100, 1000)
+        >>> estimate, round(low), round(high)
+        (100.0, 57, 170)
+        >>> estimate, low, high = estimate_count(0, 100, 10000)
+        >>> estimate, round(low), round(high)
+        (0.0, 0, 366)
+        >>> estimate_count(10, 100, 100)
+        (10.0, 10, 10)
+    """
+    if sample_size == 0:
+        return 0.0, 0, population
+    if sample_size >= population:
+        return float(sample_count), sample_count, sample_count
+
+    proportion = sample_count / sample_size
+    effective_size = sample_size * (population - 1) / (population - sample_size)
+    z_squared = z**2 / effective_size
+    center = (proportion + z_squared / 2) / (1 + z_squared)
+    half_width = (
+        z
+        / (1 + z_squared)
+        * math.sqrt(
+            proportion * (1 - proportion) / effective_size
+            + z**2 / (4 * effective_size**2)
+        )
+    )
+
+    # the sample itself proves at least 'sample_count' matching (and 'sample_size - sample_count'
+    # non-matching) entries exist
+    low = max(population * (center - half_width), sample_count)
+    high = min(
+        population * (center + half_width), population - sample_size + sample_count
+    )
+
+    return population * proportion, low, high
+
+
+class EntrySampler(object):
+    """
+    A uniform random sample of entries, kept while streaming.
+
+    Attributes:
+        rate (Union[float, None]): Probability with which each entry is kept (Bernoulli sampling).
+        size (Union[int, None]): Maximum number of entries kept (reservoir sampling, 'Algorithm R').
+        seen (int): Number of entries offered so far.
+        sample (List[Any]): The sampled entries, in the order they were kept.
+
+    Examples:
+        >>> sampler = EntrySampler(size=10, seed=0)
+        >>> for entry in range(1000):
+        ...     sampler.offer(entry)
+        >>> len(sampler.sample), sampler.seen, sampler.scale
+        (10, 1000, 100.0)
+    """
+
+    def __init__(
+        self,
+        rate: Union[float, None] = None,
+        size: Union[int, None] = None,
+        seed: Union[int, None] = None,
+    ):
+        if (rate is None) == (size is None):
+            raise ValueError("Exactly one of 'rate' or 'size' must be set")
+        if rate is not None and not 0 < rate <= 1:
+            raise ValueError(f"Sample rate must be in (0, 1], got {rate}")
+        if size is not None and size < 1:
+            raise ValueError(f"Sample size must be at least 1, got {size}")
+
+        self.rate = rate
+        self.size = size
+        self.seen: int = 0
+        self.sample: List[Any] = []
+        self._random = random.Random(seed)
+
+    def offer(self, item: Any) -> None:
+        self.seen += 1
+
+        if self.rate is not None:
+            if self._random.random() < self.rate:
+                self.sample.append(item)
+        elif len(self.sample) < self.size:
+            self.sample.append(item)
+        else:
+            # replace a kept entry with probability size / seen
+            index = self._random.randrange(self.seen)
+            if index < self.size:
+                self.sample[index] = item
+
+    @property
+    def scale(self) -> float:
+        """The number of entries in the file that each sampled entry stands for."""
+        return self.seen / len(self.sample) if self.sample else 0.0
+
+
+class HyperLogLog(object):
+    """
+    Approximate distinct-value counter, with a relative standard error of about 1.04 / sqrt(2**precision).
+
+    Attributes:
+        precision (int): Number of hash bits used to choose a register; uses 2**precision registers.
+
+    Examples:
+        >>> hll = HyperLogLog()
+        >>> for value in range(10000):
+        ...     hll.add(str(value))
+        >>> abs(hll.count() - 10000) < 500
+        True
+    """
+
+    def __init__(self, precision: int = 12):
+        self.precision = precision
+        self._size = 1 << precision
+        self._registers = bytearray(self._size)
+        self._alpha = 0.7213 / (1 + 1.079 / self._size)
+
+    def add(self, value: Union[str, None]) -> None:
+        if value is None:
+            return
+
+        hashed = _hash64(value)
+        index = hashed & (self._size - 1)
+        remaining = hashed >> self.precision
+        # position of the lowest set bit in the remaining hash bits
+        rank = (
+            (remaining & -remaining).bit_length() if remaining else 65 - self.precision
+        )
+        if rank > self._registers[index]:
+            self._registers[index] = rank
+
+    def count(self) -> int:
+        estimate = (
+            self._alpha
+            * self._size**2
+            / sum(2.0**-register for register in self._registers)
+        )
+
+        # small range correction (linear counting)
+        empty = self._registers.count(0)
+        if estimate <= 2.5 * self._size and empty:
+            estimate = self._size * math.log(self._size / empty)
+
+        return round(estimate)
+
+
+class CountMinSketch(object):
+    """
+    Approximate frequency counter. Estimates never undercount, and overcount by at most
+    e / width * total with probability 1 - exp(-depth).
+
+    Attributes:
+        width (int): Number of counters per row.
+        depth (int): Number of rows (independent hash functions).
+        capacity (int): Number of candidate heavy hitters tracked for 'most_common'.
+        total (int): Number of values added so far.
+
+    Examples:
+        >>> sketch = CountMinSketch()
+        >>> for value in ["INFO"] * 90 + ["ERROR"] * 9 + ["WARN"]:
+        ...     sketch.add(value)
+        >>> sketch.most_common(2)
+        [('INFO', 90), ('ERROR', 9)]
+    """
+
+    def __init__(self, width: int = 2048, depth: int = 4, capacity: int = 64):
+        self.width = width
+        self.depth = depth
+        self.capacity = capacity
+        self.total: int = 0
+        self._rows = [[0] * width for _ in range(depth)]
+        self._candidates: Dict[str, int] = {}
+
+    def _indexes(self, value: str) -> List[int]:
+        # derive 'depth' hash functions from two, via double hashing
+        first, second = _hash64(value), _hash64(value, salt=b"sawmill")
+        return [(first + row * second) % self.width for row in range(self.depth)]
+
+    def add(self, value: Union[str, None], count: int = 1) -> None:
+        if value is None:
+            return
+
+        self.total += count
+        estimate = None
+        for row, index in zip(self._rows, self._indexes(value), strict=True):
+            row[index] += count
+            estimate = row[index] if estimate is None else min(estimate, row[index])
+
+        self._candidates[value] = estimate
+        if len(self._candidates) > 2 * self.capacity:
+            # keep only the heaviest candidates, so memory stays bounded
+            self._candidates = dict(self.most_common(self.capacity))
+
+    def estimate(self, value: str) -> int:
+        return min(
+            row[index]
+            for row, index in zip(self._rows, self._indexes(value), strict=True)
+        )
+
+    def most_common(self, k: int) -> List[Tuple[str, int]]:
+        ranked = sorted(
+            self._candidates.items(), key=lambda item: item[1], reverse=True
+        )
+
+        return ranked[:k]
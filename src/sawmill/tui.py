@@ -1,5 +1,6 @@
 # src/sawmill/tui.py
 import pandas as pd
+from pandas.tseries.frequencies import to_offset
 from rich import box
 from rich.console import Console
 from rich.live import Live
@@ -8,7 +9,7 @@ from rich.text import Text
 from rich.panel import Panel
 from rich.align import Align
 
-from typing import Dict
+from typing import Dict, List
 
 console = Console()
 
@@ -81,3 +82,129 @@ def live_logs(logs: pd.DataFrame, columns=columns, table_kwargs=table_kwargs):
         live.update(
             Panel(Align.center(table), title="Sawmill Log Viewer", border_style="green")
         )
+
+
+status_styles = {"ERROR": "red", "WARN": "yellow", "INFO": "green"}
+
+# runs of up to this many empty buckets are drawn as empty rows, longer ones collapse into one row
+max_empty_buckets = 5
+
+
+def _duration(length: pd.Timedelta) -> str:
+    """Formats a whole number of minutes, e.g. '2d 3h 20min'"""
+    days, minutes = divmod(int(length.total_seconds() // 60), 24 * 60)
+    hours, minutes = divmod(minutes, 60)
+
+    return " ".join(
+        f"{value}{unit}"
+        for value, unit in ((days, "d"), (hours, "h"), (minutes, "min"))
+        if value
+    )
+
+
+def _timeline_cells(
+    bucket_start: pd.Timestamp,
+    row: pd.Series,
+    peak: int,
+    width: int,
+    top_error_component: str,
+) -> List:
+    bar = Text()
+    for status, count in row.items():
+        # round each status segment independently, keeping any non-zero count visible
+        length = max(1, round(count / peak * width)) if count else 0
+        bar.append("█" * length, style=status_styles.get(status, "dim"))
+
+    return [
+        bucket_start.strftime("%Y-%m-%d %H:%M"),
+        str(row.sum()),
+        str(row.get("ERROR", 0)),
+        bar,
+        top_error_component,
+    ]
+
+
+def timeline(rollups: pd.DataFrame, bucket: str = "1min", width: int = 30) -> Table:
+    """Render entry counts per time bucket as a histogram, coloured by log status
+
+    Each row also names the component with the most ERROR entries in that bucket, to
+    point at where a spike came from. Rollups of several files (see sawmill.rollup.rollups)
+    get a section per file. Short runs of empty buckets are drawn as empty rows, so gaps
+    and spikes read correctly on the time axis, while a longer idle stretch takes a single
+    row, so files logged days apart don't produce thousands of empty rows."""
+    rollups = rollups.dropna(subset=["minute"]).copy()
+    if "file" not in rollups.columns:
+        rollups["file"] = ""
+    rollups["bucket"] = pd.to_datetime(rollups["minute"]).dt.floor(bucket)
+    rollups["log_status"] = rollups["log_status"].fillna("OTHER")
+    step = pd.to_timedelta(to_offset(bucket))
+
+    counts = rollups.pivot_table(
+        index=["file", "bucket"],
+        columns="log_status",
+        values="entries",
+        aggfunc="sum",
+        fill_value=0,
+    )
+    errors = rollups[rollups["log_status"] == "ERROR"].dropna(subset=["component"])
+    top_error_components = (
+        errors.groupby(["file", "bucket", "component"])["entries"]
+        .sum()
+        .sort_values(ascending=False)
+        .reset_index()
+        .drop_duplicates(["file", "bucket"])
+        .set_index(["file", "bucket"])["component"]
+    )
+
+    table = Table(**table_kwargs)
+    # wide enough for a timestamp, while long file names in section headers wrap
+    table.add_column("Time", min_width=len("2024-03-28 13:29"))
+    table.add_column("Entries", justify="right")
+    table.add_column("Errors", justify="right")
+    table.add_column("Histogram", no_wrap=True, overflow="crop")
+    table.add_column("Top error component")
+
+    # one scale for every file, so their histograms can be compared
+    peak = counts.sum(axis=1).max() if len(counts) else 0
+    empty_row = pd.Series(0, index=counts.columns)
+    for file, file_counts in counts.groupby(level="file", sort=False):
+        if file:
+            if table.row_count:
+                table.add_section()
+            table.add_row(Text(file, style="bold", overflow="fold"))
+
+        previous = None
+        for (_, bucket_start), row in file_counts.iterrows():
+            empty_buckets = (
+                0 if previous is None else round((bucket_start - previous) / step) - 1
+            )
+            if empty_buckets > max_empty_buckets:
+                table.add_row(
+                    Text("…", style="dim"),
+                    "",
+                    "",
+                    Text(
+                        f"no entries for {_duration(empty_buckets * step)}",
+                        style="dim",
+                    ),
+                )
+            else:
+                for index in range(1, empty_buckets + 1):
+                    table.add_row(
+                        *_timeline_cells(
+                            previous + index * step, empty_row, peak, width, ""
+                        )
+                    )
+
+            table.add_row(
+                *_timeline_cells(
+                    bucket_start,
+                    row,
+                    peak,
+                    width,
+                    top_error_components.get((file, bucket_start), ""),
+                )
+            )
+            previous = bucket_start
+
+    return table
@@ -1,8 +1,12 @@
+from pathlib import Path
+
 import pytest
 from typer.testing import CliRunner
 from sawmill.cli import app
+from sawmill.rollup import Rollup
 
 runner = CliRunner()
+test_files = Path(__file__).parent.parent / "test_files"
 
 
 def test_read_command_with_valid_file():
@@ -23,5 +27,189 @@ def test_read_command_with_missing_file():
     assert "Missing file path" in result.stdout
 
 
+def test_diff_command_reports_new_entries(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    result = runner.invoke(
+        app,
+        [
+            "diff",
+            str(test_files / "906fe1ca_21e1_446c_8200_ee70def70831_logs_1787_txt.txt"),
+            str(
+                test_files
+                / "906fe1ca_21e1_446c_8200_ee70def70831_logs_1788_txt latest after upgrade.txt"
+            ),
+            "--query",
+            "SELECT DISTINCT status FROM df_diff ORDER BY status",
+        ],
+    )
+    assert result.exit_code == 0
+    assert "new" in result.stdout
+    assert "disappeared" in result.stdout
+
+
+def test_diff_command_prints_whole_entries(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    message = "destination > ERROR failed to write records to the staging area " * 3
+    run_a, run_b = tmp_path / "run_a.txt", tmp_path / "run_b.txt"
+    run_a.write_text("2024-03-28 13:29:16 source > INFO started\n")
+    run_b.write_text(f"2024-03-28 14:47:50 {message.strip()}\n")
+
+    result = runner.invoke(app, ["diff", str(run_a), str(run_b)])
+    assert result.exit_code == 0
+    assert f"<ts> {message.strip()}" in result.stdout
+
+
+@pytest.fixture
+def multiline_log(tmp_path, monkeypatch):
+    """A log file of 10 entries that each span 3 lines; cached tables go to tmp_path"""
+    monkeypatch.chdir(tmp_path)
+    log_file = tmp_path / "multiline.txt"
+    log_file.write_text(
+        "".join(
+            f"2024-03-20 23:12:{second:02d} source > INFO entry {second}\n"
+            "\tat first continuation line\n"
+            "\tat second continuation line\n"
+            for second in range(10)
+        )
+    )
+    return log_file
+
+
+def test_find_command_with_sample_entries_keeps_whole_entries(multiline_log):
+    result = runner.invoke(
+        app,
+        [
+            "find",
+            str(multiline_log),
+            "SELECT 'entries=' || count(*) || ' total=' || CAST(round(sum(weight)) AS INT)"
+            " AS summary FROM df_entries",
+            "--sample-entries",
+            "3",
+        ],
+    )
+    assert result.exit_code == 0
+    assert "entries=3 total=10" in result.stdout
+
+    result = runner.invoke(
+        app,
+        [
+            "find",
+            str(multiline_log),
+            "SELECT 'partial_entries=' || count(*) AS summary FROM ("
+            " SELECT entry_id FROM df_lines GROUP BY entry_id HAVING count(*) != 3)",
+            "--sample-entries",
+            "3",
+        ],
+    )
+    assert result.exit_code == 0
+    assert "partial_entries=0" in result.stdout
+
+
+def test_find_command_with_sample_entries_scales_entry_counts(multiline_log):
+    result = runner.invoke(
+        app,
+        [
+            "find",
+            str(multiline_log),
+            "SELECT count(*) AS count_entries FROM df_entries",
+            "--sample-entries",
+            "3",
+        ],
+    )
+    assert result.exit_code == 0
+    header, row = result.stdout.splitlines()[:2]
+    assert header.split() == [
+        "count_entries",
+        "count_entries_estimate",
+        "count_entries_low_95",
+        "count_entries_high_95",
+    ]
+    count, estimate, low, high = map(int, row.split()[1:])
+    assert (count, estimate) == (3, 10)
+    assert low <= estimate <= high
+
+
+def test_find_command_with_sample_rate_prints_estimates(multiline_log):
+    result = runner.invoke(
+        app,
+        ["find", str(multiline_log), "SELECT * FROM df_entries", "--sample", "0.5"],
+    )
+    assert result.exit_code == 0
+    assert "estimated_count" in result.stdout
+    assert "high_95" in result.stdout
+    # a sampled read doesn't see every entry, so it leaves the rollup alone
+    assert not list(multiline_log.parent.glob("data/*/rollup_*.json"))
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        ["--sample", "0"],
+        ["--sample", "0.5", "--sample-entries", "3"],
+    ],
+)
+@pytest.mark.parametrize("command", [["find"], ["view"]])
+def test_sample_options_reject_invalid_input(multiline_log, command, options):
+    if command == ["find"]:
+        command = [*command, str(multiline_log), "SELECT * FROM df_entries"]
+    else:
+        command = [*command, str(multiline_log)]
+
+    result = runner.invoke(app, [*command, *options])
+    assert result.exit_code == 2
+    assert "Invalid value" in result.output
+    assert result.exception is None or isinstance(result.exception, SystemExit)
+
+
+def test_timeline_command_updates_rollup_on_append(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    log_file = tmp_path / "job.txt"
+    log_file.write_text("2024-03-20 23:12:33 platform > ERROR boom\n")
+
+    result = runner.invoke(app, ["timeline", str(log_file)])
+    assert result.exit_code == 0
+    assert "2024-03-20 23:12" in result.stdout
+
+    # the appended continuation line belongs to the (pending) last entry
+    with open(log_file, "a") as f:
+        f.write("\tat a multi-line stack trace\n2024-03-20 23:14:40 source > INFO ok\n")
+
+    result = runner.invoke(app, ["timeline", str(log_file)])
+    assert result.exit_code == 0
+    assert "2024-03-20 23:14" in result.stdout
+
+    rollup = Rollup(file_path=log_file)
+    incremental = rollup.update().to_df().sort_values("minute", ignore_index=True)
+    assert incremental.to_dict(orient="records") == [
+        {
+            "minute": "2024-03-20 23:12",
+            "log_status": "ERROR",
+            "component": "platform",
+            "entries": 1,
+            "bytes": 71,
+            "multiline_entries": 1,
+        },
+        {
+            "minute": "2024-03-20 23:14",
+            "log_status": "INFO",
+            "component": "source",
+            "entries": 1,
+            "bytes": 37,
+            "multiline_entries": 0,
+        },
+    ]
+
+    rollup.cache_path.unlink()
+    rebuilt = Rollup(file_path=log_file).update().to_df()
+    assert rebuilt.sort_values("minute", ignore_index=True).equals(incremental)
+
+
+@pytest.mark.parametrize("bucket", ["5m", "bogus", "0min", "30s", "1ms", "90s"])
+def test_timeline_command_rejects_invalid_bucket(multiline_log, bucket):
+    result = runner.invoke(app, ["timeline", str(multiline_log), "--bucket", bucket])
+    assert result.exit_code == 2
+    assert "Invalid value" in result.output
+
+
 if __name__ == "__main__":
     pytest.main()
@@ -0,0 +1,100 @@
+import pytest
+
+from sawmill.diff import FingerprintIndex, diff_files, fingerprint, normalize_entry
+from sawmill.restructured import RestructuredData
+
+
+@pytest.mark.parametrize(
+    "baseline, changed",
+    [
+        ("process exited (exit code 1)", "process exited (exit code 137)"),
+        ("request failed with HTTP 404", "request failed with HTTP 500"),
+        ("valid: 3", "valid: 4"),
+        ("paid=100", "paid=250"),
+        ("Android: 12", "Android: 13"),
+    ],
+)
+def test_normalize_entry_keeps_status_and_exit_codes(baseline, changed):
+    assert fingerprint(normalize_entry(baseline)) != fingerprint(
+        normalize_entry(changed)
+    )
+
+
+@pytest.mark.parametrize(
+    "baseline, changed",
+    [
+        (
+            "start sync worker. job id: 1787 attempt id: 0",
+            "start sync worker. job id: 1788 attempt id: 1",
+        ),
+        ("sync finished in 250 ms", "sync finished in 1.5s"),
+        ("wrote 1024 bytes", "wrote 3.2 MB"),
+        ("pod running as pid=4242", "pod running as pid=77"),
+        ("retrying job_id=4242", "retrying job_id=77"),
+        ("Pod IP: 192.169.13.135", "Pod IP: 10.0.0.7"),
+        (
+            "log path: /workspace/1787/0/logs.log",
+            "log path: /workspace/1788/1/logs.log",
+        ),
+        ("uploaded part 1234567", "uploaded part 7654321"),
+    ],
+)
+def test_normalize_entry_masks_volatile_numbers(baseline, changed):
+    assert normalize_entry(baseline) == normalize_entry(changed)
+
+
+def test_diff_files_reports_changed_exit_code_as_new(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    run_a, run_b = tmp_path / "run_a.txt", tmp_path / "run_b.txt"
+    run_a.write_text("2024-03-28 13:29:16 destination > process done (exit code 0)\n")
+    run_b.write_text("2024-03-28 14:47:50 destination > process done (exit code 137)\n")
+
+    results = diff_files(run_a, run_b)
+    statuses = dict(zip(results["status"], results["entry"], strict=True))
+
+    assert statuses == {
+        "new": "<ts> destination > process done (exit code 137)",
+        "disappeared": "<ts> destination > process done (exit code 0)",
+    }
+
+
+def test_fingerprint_index_built_by_read_is_reused_and_extended(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    run_a, run_b = tmp_path / "run_a.txt", tmp_path / "run_b.txt"
+    entries = (
+        "2024-03-28 13:29:16 source > INFO start sync worker. job id: 1787\n"
+        "2024-03-28 13:29:17 destination > ERROR write failed\n"
+        "\tat a multi-line stack trace\n"
+    )
+    run_a.write_text(entries)
+    run_b.write_text(entries)
+
+    # read() builds the index from the entries it parsed, without a second pass over the file
+    with monkeypatch.context() as patch:
+        patch.setattr(FingerprintIndex, "update", None)
+        RestructuredData(file_path=run_a).read()
+        RestructuredData(file_path=run_b).read()
+    assert diff_files(run_a, run_b).empty
+
+    # appended lines continue the last entry, and add a new one
+    with open(run_b, "a") as f:
+        f.write(
+            "\tat another stack frame\n2024-03-28 13:30:00 destination > INFO done\n"
+        )
+
+    results = diff_files(run_a, run_b)
+    assert sorted(zip(results["status"], results["entry"], strict=True)) == [
+        (
+            "disappeared",
+            "<ts> destination > ERROR write failed\n at a multi-line stack trace",
+        ),
+        (
+            "new",
+            "<ts> destination > ERROR write failed\n at a multi-line stack trace\n at another stack frame",
+        ),
+        ("new", "<ts> destination > INFO done"),
+    ]
+
+    extended = FingerprintIndex(file_path=run_b).update()
+    extended.cache_path.unlink()
+    assert extended.counts == FingerprintIndex(file_path=run_b).update().counts
@@ -0,0 +1,83 @@
+from rich.console import Console
+
+from sawmill.restructured import RestructuredData
+from sawmill.rollup import Rollup, rollups
+from sawmill.tui import timeline
+
+
+def _sorted(rollup):
+    return rollup.to_df().sort_values(["minute", "log_status"], ignore_index=True)
+
+
+def test_rollup_built_by_read_matches_streamed_rollup(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    log_file = tmp_path / "job.txt"
+    log_file.write_text(
+        "header line before the first entry\n"
+        "2024-03-20 23:12:33 platform > ERROR boom\n"
+        "\tat a multi-line stack trace\n"
+        "2024-03-20 23:14:40 source > INFO ok\n"
+    )
+
+    # read() builds the rollup from the entries it parsed, without a second pass over the file
+    with monkeypatch.context() as patch:
+        patch.setattr(Rollup, "update", None)
+        RestructuredData(file_path=log_file).read()
+
+    built = Rollup(file_path=log_file).update()
+    built.cache_path.unlink()
+    assert _sorted(built).equals(_sorted(Rollup(file_path=log_file).update()))
+
+
+def test_rollups_of_files_with_the_same_name_are_kept_apart(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    file_a, file_b = tmp_path / "a" / "app.log", tmp_path / "b" / "app.log"
+    file_a.write_text("2024-03-20 23:12:33 platform > ERROR boom\n")
+    file_b.write_text("2024-03-20 23:14:40 source > INFO ok\n")
+
+    assert Rollup(file_path=file_a).cache_path != Rollup(file_path=file_b).cache_path
+
+    combined = rollups([file_a, file_b])
+    assert combined.set_index("file")["log_status"].to_dict() == {
+        str(file_a): "ERROR",
+        str(file_b): "INFO",
+    }
+
+
+def test_corrupt_rollup_is_rebuilt(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    log_file = tmp_path / "job.txt"
+    log_file.write_text("2024-03-20 23:12:33 platform > ERROR boom\n")
+
+    rollup = Rollup(file_path=log_file).update()
+    expected = _sorted(rollup)
+    rollup.cache_path.write_text(rollup.cache_path.read_text()[:20])
+
+    assert _sorted(Rollup(file_path=log_file).update()).equals(expected)
+
+
+def test_timeline_of_files_far_apart_collapses_idle_stretches(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    file_a, file_b = tmp_path / "run_a.log", tmp_path / "run_b.log"
+    file_a.write_text(
+        "2024-03-20 23:12:33 platform > ERROR boom\n"
+        "2024-03-20 23:14:40 source > INFO ok\n"
+    )
+    file_b.write_text(
+        "2025-03-20 23:12:33 platform > INFO start\n"
+        "2025-03-21 02:00:00 platform > ERROR boom\n"
+    )
+
+    table = timeline(rollups([file_a, file_b]))
+    console = Console(width=200, record=True)
+    console.print(table)
+    output = console.export_text()
+
+    # a header per file, one empty minute drawn between 23:12 and 23:14, and the year between
+    # the files and the 2h47min between the entries of run_b not drawn minute by minute
+    assert table.row_count == 8
+    assert "2024-03-20 23:13" in output
+    assert "no entries for 2h 47min" in output
+    assert output.index(str(file_a)) < output.index(str(file_b))